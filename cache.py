@@ -0,0 +1,69 @@
+"""
+Simple file-backed cache for yfinance downloads.
+
+Downloaded DataFrames are pickled under .cache/ using an md5 hash of the
+request parameters as the filename, so repeated runs within the TTL read
+the data from disk instead of hitting Yahoo Finance again.
+"""
+
+import hashlib
+import pickle
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+CACHE_DIR = Path(".cache")
+DEFAULT_TTL = 12 * 60 * 60  # 12 hours - weekly bars rarely change within a day
+
+def make_key(tickers, **params):
+    """
+    Build a cache key from the tickers and download parameters.
+    The Monday of the current week is included so that a new weekly bar
+    always results in a cache miss.
+    """
+    if isinstance(tickers, str):
+        tickers = [tickers]
+
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+
+    parts = [",".join(sorted(tickers))]
+    parts += [f"{name}={value}" for name, value in sorted(params.items())]
+    parts.append(week_start.isoformat())
+    return "|".join(parts)
+
+def _cache_path(key):
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+    return CACHE_DIR / f"{digest}.pkl"
+
+def get(key, ttl=DEFAULT_TTL):
+    """
+    Return the cached value for key, or None if missing or older than ttl seconds.
+    A ttl of None means the entry never expires.
+    """
+    path = _cache_path(key)
+    if not path.exists():
+        return None
+
+    if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # Corrupt or partially written entry - treat as a miss
+        return None
+
+def set(key, value):
+    """
+    Store value under key in the cache directory.
+    """
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = _cache_path(key)
+
+    # Write to a temp file first so a crash never leaves a truncated entry
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(path)
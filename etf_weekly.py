@@ -0,0 +1,112 @@
+"""
+Shared weekly ETF data for the weekly report scripts.
+
+Holds the tracked ETF universe and a memoized download of weekly percentage
+changes, so running weekly-performance.py and weekly-price-change.py in one
+process only fetches the data once.
+"""
+
+import functools
+import numpy as np
+import pandas as pd
+from types import MappingProxyType
+from datetime import timedelta
+import yahoo
+
+# ETFs to track with their names for the legend, as fixed (ticker, name) pairs
+_ETF_NAMES_FROZEN = (
+    ("XRT", "SPDR S&P Retail ETF"),
+    ("XSW", "SPDR S&P Software & Services ETF"),
+    ("XTN", "SPDR S&P Transportation ETF"),
+    ("XNTK", "SPDR NYSE Technology ETF"),
+    ("XPH", "SPDR S&P Pharmaceuticals ETF"),
+    ("XOP", "SPDR S&P Oil & Gas Exploration & Production ETF"),
+    ("XES", "SPDR S&P Oil & Gas Equipment & Services ETF"),
+    ("KRE", "SPDR S&P Regional Banking ETF"),
+    ("KCE", "SPDR S&P Capital Markets ETF"),
+    ("KIE", "SPDR S&P Insurance ETF"),
+    ("XHS", "SPDR S&P Health Care Services ETF"),
+    ("XHE", "SPDR S&P Health Care Equipment ETF"),
+    ("KBE", "SPDR S&P Bank ETF"),
+    ("RWR", "SPDR Dow Jones REIT ETF"),
+    ("XBI", "SPDR S&P Biotech ETF"),
+    ("XLB", "Materials Select Sector SPDR Fund"),
+    ("XLI", "Industrial Select Sector SPDR Fund"),
+    ("XLRE", "Real Estate Select Sector SPDR Fund"),
+    ("XLU", "Utilities Select Sector SPDR Fund"),
+    ("XLK", "Technology Select Sector SPDR Fund"),
+    ("XLF", "Financial Select Sector SPDR Fund"),
+    ("XLG", "Invesco S&P 500 Top 50 ETF"),
+    ("XAR", "SPDR S&P Aerospace & Defense ETF"),
+    ("XLC", "Communication Services Select Sector SPDR Fund"),
+    ("XLP", "Consumer Staples Select Sector SPDR Fund"),
+    ("XLV", "Health Care Select Sector SPDR Fund"),
+    ("XME", "SPDR S&P Metals & Mining ETF"),
+    ("XSD", "SPDR S&P Semiconductor ETF"),
+    ("XTL", "SPDR S&P Telecom ETF"),
+    ("XLY", "Consumer Discretionary Select Sector SPDR Fund"),
+    ("XHB", "SPDR S&P Homebuilders ETF"),
+    ("XLE", "Energy Select Sector SPDR Fund")
+)
+
+# List of ETFs to track
+etf_list = [ticker for ticker, _ in _ETF_NAMES_FROZEN]
+
+# ETF names for legend (read-only)
+etf_names = MappingProxyType(dict(_ETF_NAMES_FROZEN))
+
+# Complete legend, sorted by ticker, built once for the weekly reports
+FULL_LEGEND = "\n".join(f"{ticker:6} - {etf_names[ticker]}" for ticker in sorted(etf_list))
+
+@functools.lru_cache(maxsize=None)
+def week_labels(num_weeks):
+    """
+    Column labels for num_weeks of weekly changes, most recent first:
+    ('Week 1 (Latest)', 'Week 2', ..., 'Week N').
+    """
+    labels = ("Week 1 (Latest)",) + tuple(f"Week {i}" for i in range(2, num_weeks + 1))
+    return labels[:num_weeks]
+
+@functools.lru_cache(maxsize=8)
+def fetch_pct_changes(tickers, num_weeks, end_date=None):
+    """
+    Get the last num_weeks of weekly percentage changes (rows = weeks, oldest first;
+    columns = tickers). tickers must be a tuple so the result can be memoized.
+    The returned DataFrame is shared between callers, so treat it as read-only.
+
+    Args:
+        tickers: Tuple of ETF ticker symbols
+        num_weeks: Number of weeks of changes to return
+        end_date: End date for the analysis as a datetime. If None, uses current date.
+    """
+    # Only the adjusted close is used: auto_adjust folds dividends and splits into
+    # 'Close' and actions=False skips the dividend/split columns
+    download_args = {'auto_adjust': True, 'actions': False}
+
+    if end_date:
+        # Download exactly the weeks needed: num_weeks + 1 bars give num_weeks of changes,
+        # plus one spare week in case the first bar starts after the start date
+        start = (end_date - timedelta(weeks=num_weeks + 2)).strftime('%Y-%m-%d')
+        df = yahoo.download(list(tickers), interval="1wk", start=start,
+                            end=end_date.strftime('%Y-%m-%d'), **download_args)
+    else:
+        # Up to today, reuse the stored weekly history and only download the bars since
+        # the last run (the whole period again if a dividend or split rescaled the prices)
+        period = f"{num_weeks // 4 + 2}mo"
+        df = yahoo.download_weekly_history(list(tickers), period, min_weeks=num_weeks + 1,
+                                           **download_args)
+        df = df.iloc[-(num_weeks + 1):]
+
+    # Columns are always (field, ticker) for a multi-ticker download
+    data = df['Close']
+
+    # Calculate percentage change for each week in one NumPy expression
+    # (x / previous - 1) is a decimal (0.01), so we multiply by 100 for percentage (1.0%).
+    # The first week has no previous close and stays NaN, as with pct_change()
+    vals = data.to_numpy(dtype=np.float64)
+    pct_changes = np.full_like(vals, np.nan)
+    pct_changes[1:] = (vals[1:] / vals[:-1] - 1.0) * 100.0
+
+    # Get the last num_weeks of changes
+    return pd.DataFrame(pct_changes[-num_weeks:], index=data.index[-num_weeks:],
+                        columns=data.columns)
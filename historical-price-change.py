@@ -1,24 +1,44 @@
-import yfinance as yf
-import pandas as pd
+import sys
+import numpy as np
 import argparse
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
+import yahoo
+from etf_weekly import etf_list
+
+# Benchmark ticker, downloaded in the same batch as the ETFs
+BENCHMARK_TICKER = "SPY"
 
 def get_weekly_etf_performance(tickers, num_weeks=10, weeks_ago=0):
     # Download enough historical data to cover the requested weeks plus offset
     total_weeks_needed = num_weeks + weeks_ago + 4
     period = f"{max(12, (total_weeks_needed // 4))}mo"
-    df = yf.download(tickers, period=period, interval="1wk", progress=False)
 
-    # Use 'Adj Close' if available, otherwise fall back to 'Close'
-    if 'Adj Close' in df.columns.levels[0]:
-        data = df['Adj Close']
-    else:
-        data = df['Close']
+    # Fetch the benchmark together with the ETFs to save a second request
+    download_tickers = list(tickers) + [BENCHMARK_TICKER]
+
+    # Only bars newer than the stored history are downloaded on repeat runs, as long as
+    # the re-downloaded weeks still match it (otherwise the full period is fetched again).
+    # auto_adjust folds dividends and splits into 'Close', which is what that check compares
+    df = yahoo.download_weekly_history(download_tickers, period, min_weeks=total_weeks_needed,
+                                       auto_adjust=True, actions=False)
+
+    # Trim to the weeks we need before computing changes
+    df = df.iloc[-total_weeks_needed:]
 
-    # Calculate percentage change for each week
-    pct_changes = data.pct_change() * 100
+    # Columns are always (field, ticker) for a multi-ticker download
+    data = df['Close']
+
+    # Calculate percentage change for each week, ETFs and benchmark in one pass
+    # (fill_method=None leaves gaps as NaN instead of forward filling prices)
+    pct_changes = data.pct_change(fill_method=None) * 100
+
+    # Split the benchmark back out from the ETF prices and changes
+    benchmark_data = data[BENCHMARK_TICKER]
+    benchmark_changes = pct_changes[BENCHMARK_TICKER]
+    data = data.drop(columns=[BENCHMARK_TICKER])
+    pct_changes = pct_changes.drop(columns=[BENCHMARK_TICKER])
 
     # Get the window starting from weeks_ago
     if weeks_ago > 0:
@@ -30,80 +50,68 @@ def get_weekly_etf_performance(tickers, num_weeks=10, weeks_ago=0):
 
     recent_changes = pct_changes.iloc[start_idx:end_idx]
     recent_data = data.iloc[start_idx:end_idx]
+    recent_benchmark_changes = benchmark_changes.iloc[start_idx:end_idx]
+    recent_benchmark_data = benchmark_data.iloc[start_idx:end_idx]
+
+    # Work on the underlying NumPy arrays instead of per-cell label lookups.
+    # pandas hands back column-major arrays, but each week is read as a row below,
+    # so make them row-major (C-contiguous) once up front
+    prices = np.ascontiguousarray(recent_data.to_numpy(dtype=np.float64))
+    changes = np.ascontiguousarray(recent_changes.to_numpy(dtype=np.float64))
+    valid = np.isfinite(prices) & np.isfinite(changes)
+    # Stored values are rounded with the builtin round(), which rounds the exact
+    # decimal value; np.round can differ on half-way inputs such as 361.015
+    price_rows = [[round(price, 2) for price in row] for row in prices.tolist()]
+    change_rows = [[round(change, 2) for change in row] for row in changes.tolist()]
+    rounded_changes = np.array(change_rows, dtype=np.float64).reshape(changes.shape)
+    column_tickers = recent_data.columns.tolist()
+
+    benchmark_prices = recent_benchmark_data.to_numpy(dtype=np.float64)
+    benchmark_pct = recent_benchmark_changes.to_numpy(dtype=np.float64)
+    benchmark_valid = np.isfinite(benchmark_prices) & np.isfinite(benchmark_pct)
+
+    # yfinance weekly data is indexed to Monday, adjust to Friday (add 4 days)
+    week_ending_dates = (recent_changes.index + timedelta(days=4)).strftime('%Y-%m-%d').tolist()
 
     # Build list of objects for each week (Friday close)
     weekly_records = []
-    for idx, row in recent_changes.iterrows():
-        # yfinance weekly data is indexed to Monday, adjust to Friday (add 4 days)
-        friday_date = idx + timedelta(days=4)
-        date_str = friday_date.strftime('%Y-%m-%d')
+    for i, date_str in enumerate(week_ending_dates):
+        price_row = price_rows[i]
+        change_row = change_rows[i]
+
+        # Order valid ETFs by change_percent descending (stable, so ties keep column order)
+        valid_idx = np.flatnonzero(valid[i])
+        order = valid_idx[np.argsort(-rounded_changes[i, valid_idx], kind='stable')]
+
         week_data = {
             'week_ending': date_str,
-            'etfs': []
+            'etfs': [
+                {
+                    'ticker': column_tickers[j],
+                    'price': price_row[j],
+                    'change_percent': change_row[j]
+                }
+                for j in order.tolist()
+            ]
         }
 
-        for ticker in data.columns:
-            pct_change = row[ticker]
-            price = recent_data.loc[idx, ticker]
-
-            if pd.notna(pct_change) and pd.notna(price):
-                week_data['etfs'].append({
-                    'ticker': ticker,
-                    'price': round(float(price), 2),
-                    'change_percent': round(float(pct_change), 2)
-                })
+        # Record the benchmark change for this week
+        if benchmark_valid[i]:
+            week_data['benchmark'] = {
+                'ticker': BENCHMARK_TICKER,
+                'price': round(float(benchmark_prices[i]), 2),
+                'change_percent': round(float(benchmark_pct[i]), 2)
+            }
 
-        # Sort ETFs by change_percent descending
-        week_data['etfs'].sort(key=lambda x: x['change_percent'], reverse=True)
         weekly_records.append(week_data)
 
     return weekly_records
 
-# List of ETFs to track
-etf_list = [
-    "XRT", "XSW", "XTN", "XNTK", "XPH", "XOP", "XES", "KRE", "KCE", "KIE",
-    "XHS", "XHE", "KBE", "RWR", "XBI", "XLB", "XLI", "XLRE", "XLU", "XLK",
-    "XLF", "XLG", "XAR", "XLC", "XLP", "XLV", "XME", "XSD", "XTL", "XLY",
-    "XHB", "XLE"
-]
-
-# ETF names for legend
-etf_names = {
-    "XRT": "SPDR S&P Retail ETF",
-    "XSW": "SPDR S&P Software & Services ETF",
-    "XTN": "SPDR S&P Transportation ETF",
-    "XNTK": "SPDR NYSE Technology ETF",
-    "XPH": "SPDR S&P Pharmaceuticals ETF",
-    "XOP": "SPDR S&P Oil & Gas Exploration & Production ETF",
-    "XES": "SPDR S&P Oil & Gas Equipment & Services ETF",
-    "KRE": "SPDR S&P Regional Banking ETF",
-    "KCE": "SPDR S&P Capital Markets ETF",
-    "KIE": "SPDR S&P Insurance ETF",
-    "XHS": "SPDR S&P Health Care Services ETF",
-    "XHE": "SPDR S&P Health Care Equipment ETF",
-    "KBE": "SPDR S&P Bank ETF",
-    "RWR": "SPDR Dow Jones REIT ETF",
-    "XBI": "SPDR S&P Biotech ETF",
-    "XLB": "Materials Select Sector SPDR Fund",
-    "XLI": "Industrial Select Sector SPDR Fund",
-    "XLRE": "Real Estate Select Sector SPDR Fund",
-    "XLU": "Utilities Select Sector SPDR Fund",
-    "XLK": "Technology Select Sector SPDR Fund",
-    "XLF": "Financial Select Sector SPDR Fund",
-    "XLG": "Invesco S&P 500 Top 50 ETF",
-    "XAR": "SPDR S&P Aerospace & Defense ETF",
-    "XLC": "Communication Services Select Sector SPDR Fund",
-    "XLP": "Consumer Staples Select Sector SPDR Fund",
-    "XLV": "Health Care Select Sector SPDR Fund",
-    "XME": "SPDR S&P Metals & Mining ETF",
-    "XSD": "SPDR S&P Semiconductor ETF",
-    "XTL": "SPDR S&P Telecom ETF",
-    "XLY": "Consumer Discretionary Select Sector SPDR Fund",
-    "XHB": "SPDR S&P Homebuilders ETF",
-    "XLE": "Energy Select Sector SPDR Fund"
-}
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:].
+    """
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Generate weekly ETF performance data as JSON')
     parser.add_argument('-w', '--weeks', type=int, default=10,
@@ -112,7 +120,7 @@ if __name__ == "__main__":
                         help='Start the window N weeks ago (default: 0 = most recent)')
     parser.add_argument('-o', '--output', action='store_true',
                         help='Write output to file in output/ directory')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Get performance data
     weekly_records = get_weekly_etf_performance(
@@ -121,9 +129,6 @@ if __name__ == "__main__":
         weeks_ago=args.ago
     )
 
-    # Convert to JSON
-    json_output = json.dumps(weekly_records, indent=2)
-
     # Output to file or console
     if args.output:
         # Create output directory if it doesn't exist
@@ -133,16 +138,20 @@ if __name__ == "__main__":
         # Format filename using most recent week ending date
         if weekly_records:
             latest_date = weekly_records[-1]['week_ending']
-            date_obj = datetime.strptime(latest_date, '%Y-%m-%d')
-            filename = f"weekly-performance-{date_obj.strftime('%Y-%m-%d')}.json"
+            filename = f"weekly-performance-{latest_date}.json"
         else:
             filename = f"weekly-performance-{datetime.now().strftime('%Y-%m-%d')}.json"
 
         filepath = output_dir / filename
 
-        with open(filepath, 'w') as f:
-            f.write(json_output)
+        # Stream the JSON straight into the file buffer
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(weekly_records, f, indent=2)
 
         print(f"JSON data written to {filepath}")
     else:
-        print(json_output)
+        json.dump(weekly_records, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+JSON helpers for the analysis scripts.
+
+Uses orjson when it is installed, which parses and serializes the large
+weekly/rolling files several times faster, and falls back to the standard
+library json module otherwise. Both produce the same 2-space indented output.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def load(f):
+    """
+    Parse JSON from an open file.
+    """
+    if orjson is not None:
+        return orjson.loads(f.read())
+    return json.load(f)
+
+def dumps(obj):
+    """
+    Serialize obj to a 2-space indented JSON string.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Fused in-process version of the ETF momentum portfolio analysis.
+
+Runs the same steps as run-analysis.py, but passes the weekly and rolling
+data between steps as Python objects instead of writing JSON files and
+parsing them again in each script:
+1. Fetch historical weekly ETF performance data (or read an existing file)
+2. Calculate rolling 10-week scores
+3. Generate rolling performance report
+4. Calculate running portfolio with momentum strategy
+5. Calculate dollar returns with SPY benchmark comparison
+
+Only the three text reports are written, unless --json is given.
+
+Usage:
+    python pipeline.py
+    python pipeline.py -i output/weekly-performance-2026-02-27.json
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+from datetime import datetime
+import jsonio
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+def load_script(script):
+    """
+    Import a pipeline script by file name (the names contain hyphens).
+    """
+    module_name = Path(script).stem.replace("-", "_")
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPT_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def output_path(prefix, latest_date, suffix):
+    """
+    Build output/<prefix>-<date><suffix>, using today's date when there is no data.
+    """
+    # Create output directory if it doesn't exist
+    output_dir = Path("output")
+    output_dir.mkdir(exist_ok=True)
+
+    date_str = latest_date or datetime.now().strftime('%Y-%m-%d')
+    return output_dir / f"{prefix}-{date_str}{suffix}"
+
+def run_pipeline(weekly_data, write_json=False):
+    """
+    Run steps 2-5 on in-memory weekly performance data.
+    Returns the paths of the files written.
+    """
+    rolling_ten_weeks = load_script("rolling-ten-weeks.py")
+    rolling_report = load_script("rolling-ten-weeks-report.py")
+    running_portfolio = load_script("running-portfolio.py")
+    dollar_return = load_script("rolling-dollar-return.py")
+
+    # Step 2: Calculate rolling 10-week scores
+    rolling_data = rolling_ten_weeks.calculate_rolling_ten_week_scores(weekly_data)
+
+    # Step 4: Calculate running portfolio with momentum strategy
+    portfolio_history = running_portfolio.calculate_running_portfolio(rolling_data)
+
+    # Step 5: Calculate dollar returns, using the SPY data in the weekly data when present
+    sp500_lookup = dollar_return.build_sp500_lookup(weekly_data)
+    if not sp500_lookup:
+        sp500_lookup = dollar_return.fetch_sp500_for_weeks(weekly_data)
+    weekly_portfolio_values = dollar_return.calculate_portfolio_returns(
+        weekly_data, portfolio_history, sp500_lookup
+    )
+
+    # Write all outputs at the end
+    written = []
+    latest_period = rolling_data[-1]['period_end'] if rolling_data else None
+
+    if write_json:
+        filepath = output_path("rolling-performance", latest_period, ".json")
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.write(jsonio.dumps(rolling_data))
+        written.append(filepath)
+
+    # Step 3: Generate rolling performance report
+    filepath = output_path("report-rolling-performance", latest_period, ".txt")
+    with open(filepath, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.writelines(f"{line}\n" for line in rolling_report.generate_rolling_report(rolling_data))
+    written.append(filepath)
+
+    latest_portfolio = portfolio_history[-1]['period_end'] if portfolio_history else None
+    filepath = output_path("report-running-portfolio", latest_portfolio, ".txt")
+    with open(filepath, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.write(running_portfolio.generate_portfolio_report(portfolio_history, rolling_data))
+    written.append(filepath)
+
+    latest_week = weekly_portfolio_values[-1]['week_ending'] if weekly_portfolio_values else None
+    filepath = output_path("report-dollar-return", latest_week, ".txt")
+    with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        dollar_return.generate_dollar_return_report(weekly_portfolio_values, f)
+    written.append(filepath)
+
+    return written
+
+def main(argv=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:].
+    """
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description='Run the complete analysis in a single process')
+    parser.add_argument('-i', '--input', type=str,
+                        help='Weekly performance JSON file to start from (default: fetch from Yahoo Finance)')
+    parser.add_argument('-w', '--weeks', type=int, default=52,
+                        help='Number of weeks to fetch when no input file is given (default: 52)')
+    parser.add_argument('--json', action='store_true',
+                        help='Also write the weekly and rolling performance JSON files')
+    args = parser.parse_args(argv)
+
+    # Step 1: Read or fetch the weekly performance data
+    written = []
+    if args.input:
+        input_path = Path(args.input)
+        if not input_path.exists():
+            print(f"Error: Input file '{args.input}' not found")
+            exit(1)
+
+        with open(input_path, 'r', encoding='utf-8') as f:
+            weekly_data = jsonio.load(f)
+    else:
+        historical = load_script("historical-price-change.py")
+        weekly_data = historical.get_weekly_etf_performance(historical.etf_list, num_weeks=args.weeks)
+
+        if args.json:
+            latest_week = weekly_data[-1]['week_ending'] if weekly_data else None
+            filepath = output_path("weekly-performance", latest_week, ".json")
+            with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(jsonio.dumps(weekly_data))
+            written.append(filepath)
+
+    try:
+        written += run_pipeline(weekly_data, write_json=args.json)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    print("Generated files:")
+    for filepath in written:
+        print(f"  • {filepath}")
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,65 @@
-import json
+import sys
+import functools
 import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import yfinance as yf
+import numpy as np
+import yahoo
+import jsonio
 
 INITIAL_POSITION_VALUE = 20000
 INITIAL_PORTFOLIO_VALUE = 100000
 
-def fetch_sp500_returns(start_date, end_date):
+# Minimum number of weeks before the detailed report section is formatted in parallel
+PARALLEL_REPORT_MIN_WEEKS = 500
+
+@functools.lru_cache(maxsize=32)
+def _load_sp500_returns(start_date, end_date):
     """
-    Fetch S&P 500 returns for the given date range using SPY ETF.
-    Returns weekly percentage changes.
+    Download SPY weekly data and build the lookup of weekly percentage changes.
+    Memoized per (start_date, end_date); raises on failure so errors are not cached.
+    The raw download is also cached on disk by yahoo.download.
     """
-    try:
-        from datetime import datetime, timedelta
-        import pandas as pd
+    import pandas as pd
 
-        print(f"Downloading SPY data from {start_date} to {end_date}...")
+    print(f"Downloading SPY data from {start_date} to {end_date}...")
 
-        # Download SPY data
-        spy_data = yf.download('SPY', start=start_date, end=end_date, interval='1wk', progress=False)
+    # Download SPY data with flat (single level) columns. auto_adjust folds dividends
+    # and splits into 'Close', the same basis as the benchmark in the weekly data
+    spy_data = yahoo.download('SPY', start=start_date, end=end_date, interval='1wk',
+                              auto_adjust=True, actions=False, multi_level_index=False)
 
-        print(f"SPY data shape: {spy_data.shape}")
+    print(f"SPY data shape: {spy_data.shape}")
 
-        if spy_data.empty:
-            print("ERROR: SPY data is empty")
-            return {}
+    if spy_data.empty:
+        raise ValueError("SPY data is empty")
 
-        # Handle both single and multi-ticker column formats
-        if 'Adj Close' in spy_data.columns:
-            if isinstance(spy_data.columns, pd.MultiIndex):
-                prices = spy_data['Adj Close']['SPY']
-            else:
-                prices = spy_data['Adj Close']
-        else:
-            if isinstance(spy_data.columns, pd.MultiIndex):
-                prices = spy_data['Close']['SPY']
-            else:
-                prices = spy_data['Close']
-
-        print(f"First few SPY prices:")
-        print(prices.head())
-
-        # Calculate percentage changes
-        pct_changes = prices.pct_change() * 100
-
-        # Build lookup by week ending date
-        sp500_lookup = {}
-        for idx, change in pct_changes.items():
-            date_str = idx.strftime('%Y-%m-%d')
-            sp500_lookup[date_str] = float(change) if not pd.isna(change) else 0.0
-
-            # Also add Friday of that week
-            days_until_friday = (4 - idx.weekday()) % 7
-            friday = idx + timedelta(days=days_until_friday)
-            friday_str = friday.strftime('%Y-%m-%d')
-            if friday_str != date_str:
-                sp500_lookup[friday_str] = float(change) if not pd.isna(change) else 0.0
-
-        print(f"Loaded SPY data for {len(sp500_lookup)} dates")
-        print(f"First 5 SPY dates: {list(sp500_lookup.keys())[:5]}")
-        return sp500_lookup
+    prices = spy_data['Close']
+
+    print(f"First few SPY prices:")
+    print(prices.head())
+
+    # Calculate percentage changes
+    pct_changes = prices.pct_change(fill_method=None) * 100
+
+    # Build lookup keyed by the Friday of each week, matching the weekly data's week_ending
+    days_until_friday = (4 - pct_changes.index.weekday) % 7
+    fridays = (pct_changes.index + pd.to_timedelta(days_until_friday, unit='D')).strftime('%Y-%m-%d')
+    sp500_lookup = dict(zip(fridays, pct_changes.fillna(0.0).tolist()))
+
+    print(f"Loaded SPY data for {len(sp500_lookup)} dates")
+    print(f"First 5 SPY dates: {list(sp500_lookup.keys())[:5]}")
+    return sp500_lookup
+
+def fetch_sp500_returns(start_date, end_date):
+    """
+    Fetch S&P 500 returns for the given date range using SPY ETF.
+    Returns weekly percentage changes.
+    """
+    try:
+        # Copy so callers can't modify the memoized lookup
+        return dict(_load_sp500_returns(start_date, end_date))
     except Exception as e:
         print(f"ERROR: Could not fetch SPY data: {e}")
         import traceback
@@ -68,6 +67,39 @@ def fetch_sp500_returns(start_date, end_date):
         return {}
 
 
+def build_sp500_lookup(weekly_data):
+    """
+    Build the S&P 500 lookup from the SPY benchmark stored in the weekly data.
+    Returns an empty dict for weekly files written before the benchmark was included.
+    """
+    return {
+        week['week_ending']: week['benchmark']['change_percent']
+        for week in weekly_data
+        if 'benchmark' in week
+    }
+
+
+def fetch_sp500_for_weeks(weekly_data):
+    """
+    Download the S&P 500 lookup covering the weeks in weekly_data.
+    Used for weekly files written before the SPY benchmark was included.
+    """
+    start_date = weekly_data[0]['week_ending']
+    end_date = weekly_data[-1]['week_ending']
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    print(f"Fetching SPY data from {start_date} to {end_date}...")
+    print(f"Today's date: {today}")
+
+    # If end date is in the future, use today instead
+    if end_date > today:
+        print(f"WARNING: End date {end_date} is in the future. Using today ({today}) instead.")
+        end_date = today
+
+    sp500_lookup = fetch_sp500_returns(start_date, end_date)
+    print(f"Sample SPY dates: {list(sp500_lookup.keys())[:5]}")
+    print(f"Sample weekly dates: {[w['week_ending'] for w in weekly_data[:5]]}")
+    return sp500_lookup
 
 
 def calculate_running_portfolio(rolling_data):
@@ -100,9 +132,21 @@ def calculate_running_portfolio(rolling_data):
         }
     })
 
+    # Each ticker gets one bit, so top 10 and holdings membership checks are
+    # bitwise ANDs on plain ints (the lists keep the ranking/holding order)
+    ticker_bits = {}
+
+    def bit(ticker):
+        if ticker not in ticker_bits:
+            ticker_bits[ticker] = 1 << len(ticker_bits)
+        return ticker_bits[ticker]
+
     # Process each subsequent period
     for period in rolling_data[1:]:
         top_10_tickers = [etf['ticker'] for etf in period['top_10_etfs']]
+        top_10_mask = 0
+        for ticker in top_10_tickers:
+            top_10_mask |= bit(ticker)
 
         # Track changes
         added = []
@@ -110,9 +154,11 @@ def calculate_running_portfolio(rolling_data):
 
         # Check which current holdings are still in top 10
         new_portfolio = []
+        new_mask = 0
         for ticker in current_portfolio:
-            if ticker in top_10_tickers:
+            if bit(ticker) & top_10_mask:
                 new_portfolio.append(ticker)
+                new_mask |= ticker_bits[ticker]
             else:
                 dropped.append(ticker)
 
@@ -121,8 +167,9 @@ def calculate_running_portfolio(rolling_data):
         for ticker in top_10_tickers:
             if slots_to_fill == 0:
                 break
-            if ticker not in new_portfolio:
+            if not ticker_bits[ticker] & new_mask:
                 new_portfolio.append(ticker)
+                new_mask |= ticker_bits[ticker]
                 added.append(ticker)
                 slots_to_fill -= 1
 
@@ -141,6 +188,78 @@ def calculate_running_portfolio(rolling_data):
 
     return portfolio_history
 
+def _run_portfolio(weekly_changes, sp500_changes, holdings, initial_holdings, start_index):
+    """
+    Core weekly portfolio evolution over plain NumPy arrays.
+
+    weekly_changes is a (tickers x weeks) matrix of percentage changes, NaN
+    where there is no data. sp500_changes is a per-week array, 0.0 where
+    there is no data.
+    holdings is a (weeks x tickers) bool matrix of the positions held each week.
+
+    Positions are kept as parallel arrays indexed by ticker: value, entry value
+    and entry week (-1 for positions held since the initial portfolio).
+
+    Returns per-week position values and entry weeks (weeks x tickers), cash
+    available, capital invested, capital added and S&P 500 benchmark value.
+    """
+    n_tickers, n_weeks = weekly_changes.shape
+    position_values = np.zeros((n_weeks, n_tickers))
+    entry_week_history = np.full((n_weeks, n_tickers), -1, dtype=np.int64)
+    cash_history = np.zeros(n_weeks)
+    capital_history = np.zeros(n_weeks)
+    capital_added_history = np.zeros(n_weeks)
+    sp500_history = np.zeros(n_weeks)
+
+    held = initial_holdings.copy()
+    positions = np.where(held, float(INITIAL_POSITION_VALUE), 0.0)
+    entry_weeks = np.full(n_tickers, -1, dtype=np.int64)
+    cash = 0.0
+    capital = float(INITIAL_PORTFOLIO_VALUE)
+    sp500_value = float(INITIAL_PORTFOLIO_VALUE)
+
+    for w in range(start_index, n_weeks):
+        new_held = holdings[w]
+        capital_added = 0.0
+
+        # Sell dropped positions into cash
+        dropped = held & ~new_held
+        cash += positions[dropped].sum()
+        positions[dropped] = 0.0
+
+        # Buy added positions at $20k, adding capital (to both portfolio and S&P 500) when cash runs short
+        for t in np.flatnonzero(new_held & ~held):
+            if cash >= INITIAL_POSITION_VALUE:
+                cash -= INITIAL_POSITION_VALUE
+            else:
+                capital_needed = INITIAL_POSITION_VALUE - cash
+                capital += capital_needed
+                capital_added += capital_needed
+                sp500_value += capital_needed
+                cash = 0.0
+            positions[t] = INITIAL_POSITION_VALUE
+            entry_weeks[t] = w
+
+        held = new_held
+
+        # Apply weekly changes to held positions (weeks without data keep their value)
+        changes = weekly_changes[:, w]
+        changes = np.where(np.isnan(changes), 0.0, changes)
+        positions[held] *= 1 + changes[held] / 100
+
+        # Update S&P 500 benchmark (apply weekly return AFTER capital additions)
+        sp500_value *= 1 + sp500_changes[w] / 100
+
+        position_values[w] = positions
+        entry_week_history[w] = entry_weeks
+        cash_history[w] = cash
+        capital_history[w] = capital
+        capital_added_history[w] = capital_added
+        sp500_history[w] = sp500_value
+
+    return (position_values, entry_week_history, cash_history,
+            capital_history, capital_added_history, sp500_history)
+
 def calculate_portfolio_returns(weekly_data, portfolio_history, sp500_lookup):
     """
     Calculate dollar returns for the running portfolio.
@@ -150,148 +269,95 @@ def calculate_portfolio_returns(weekly_data, portfolio_history, sp500_lookup):
     Track capital invested, cash from sales, and capital additions.
     Compare to S&P 500 benchmark.
     """
-    # Build a lookup for weekly changes by ticker and date
-    weekly_changes_lookup = {}
-    for week in weekly_data:
-        week_ending = week['week_ending']
-        for etf in week['etfs']:
-            ticker = etf['ticker']
-            if ticker not in weekly_changes_lookup:
-                weekly_changes_lookup[ticker] = {}
-            weekly_changes_lookup[ticker][week_ending] = etf['change_percent']
-
-    # Track position values
-    position_values = {}
-    weekly_portfolio_values = []
+    # Get all unique week ending dates from the weekly data, sorted
+    all_weeks = sorted(set(week['week_ending'] for week in weekly_data))
 
-    # Track capital
-    total_capital_invested = INITIAL_PORTFOLIO_VALUE
-    cash_available = 0  # Cash from sales not yet reinvested
+    # Index tickers and weeks so the weekly changes fit in a (tickers x weeks) matrix
+    all_tickers = sorted(
+        {etf['ticker'] for week in weekly_data for etf in week['etfs']}
+        | {ticker for entry in portfolio_history for ticker in entry['portfolio']}
+    )
+    ticker_idx = {ticker: i for i, ticker in enumerate(all_tickers)}
+    week_to_idx = {week: i for i, week in enumerate(all_weeks)}
 
-    # Initialize first portfolio
-    first_entry = portfolio_history[0]
-    for ticker in first_entry['portfolio']:
-        position_values[ticker] = {
-            'value': INITIAL_POSITION_VALUE,
-            'entry_date': first_entry['period_end'],
-            'entry_value': INITIAL_POSITION_VALUE
-        }
+    # NaN marks weeks without data for a ticker
+    weekly_changes = np.full((len(all_tickers), len(all_weeks)), np.nan)
+    for week in weekly_data:
+        col = week_to_idx[week['week_ending']]
+        for etf in week['etfs']:
+            weekly_changes[ticker_idx[etf['ticker']], col] = etf['change_percent']
 
-    # Get all unique week ending dates from the weekly data, sorted
-    all_weeks = sorted(set(week['week_ending'] for week in weekly_data))
+    # Weeks without S&P 500 data leave the benchmark unchanged
+    sp500_changes = np.array([sp500_lookup.get(week, 0.0) for week in all_weeks], dtype=np.float64)
+    sp500_changes[np.isnan(sp500_changes)] = 0.0
 
     # Find the starting week (first period end date)
+    first_entry = portfolio_history[0]
     start_week = first_entry['period_end']
-    start_index = all_weeks.index(start_week) if start_week in all_weeks else 0
+    start_index = week_to_idx.get(start_week, 0)
 
-    # Track which portfolio period we're in
-    period_index = 0
-    current_portfolio_tickers = set(first_entry['portfolio'])
+    initial_holdings = np.zeros(len(all_tickers), dtype=bool)
+    initial_holdings[[ticker_idx[ticker] for ticker in first_entry['portfolio']]] = True
 
-    # Track S&P 500 benchmark with equal capital additions
-    sp500_value = INITIAL_PORTFOLIO_VALUE
-    sp500_total_capital_invested = INITIAL_PORTFOLIO_VALUE
+    # Work out which tickers are held each week, keeping the portfolio order for the report
+    holdings = np.zeros((len(all_weeks), len(all_tickers)), dtype=bool)
+    held_rows = [[] for _ in all_weeks]
+    period_end_to_idx = {
+        portfolio_history[i]['period_end']: i
+        for i in range(1, len(portfolio_history))
+    }
+    current_rows = [ticker_idx[ticker] for ticker in first_entry['portfolio']]
 
-    # Process each week from start
     for week_idx in range(start_index, len(all_weeks)):
         week_ending = all_weeks[week_idx]
-        capital_added_this_week = 0
-        sp500_capital_added_this_week = 0
 
         # Check if we need to update portfolio (new period starts)
-        if period_index < len(portfolio_history) - 1:
-            next_period = portfolio_history[period_index + 1]
-            if week_ending == next_period['period_end']:
-                # Update portfolio for new period
-                period_index += 1
-                new_portfolio_tickers = set(next_period['portfolio'])
-
-                # Handle drops - sell positions and add to cash
-                for ticker in current_portfolio_tickers - new_portfolio_tickers:
-                    if ticker in position_values:
-                        sale_value = position_values[ticker]['value']
-                        cash_available += sale_value
-                        del position_values[ticker]
-
-                # Handle adds - buy new positions at $20k
-                for ticker in new_portfolio_tickers - current_portfolio_tickers:
-                    # Check if we have enough cash
-                    if cash_available >= INITIAL_POSITION_VALUE:
-                        # Use cash from sales
-                        cash_available -= INITIAL_POSITION_VALUE
-                    else:
-                        # Need to add capital
-                        capital_needed = INITIAL_POSITION_VALUE - cash_available
-                        total_capital_invested += capital_needed
-                        capital_added_this_week += capital_needed
-
-                        # Add same amount to S&P 500 benchmark
-                        sp500_total_capital_invested += capital_needed
-                        sp500_capital_added_this_week += capital_needed
-                        sp500_value += capital_needed
-
-                        cash_available = 0
-
-                    position_values[ticker] = {
-                        'value': INITIAL_POSITION_VALUE,
-                        'entry_date': week_ending,
-                        'entry_value': INITIAL_POSITION_VALUE
-                    }
-
-                current_portfolio_tickers = new_portfolio_tickers
-
-        # Apply weekly changes to all held positions
-        week_total = 0
-        position_details = []
+        period_idx = period_end_to_idx.get(week_ending)
+        if period_idx is not None:
+            current_rows = [ticker_idx[ticker] for ticker in portfolio_history[period_idx]['portfolio']]
 
-        for ticker in current_portfolio_tickers:
-            if ticker in position_values:
-                # Get the change for this week
-                if ticker in weekly_changes_lookup and week_ending in weekly_changes_lookup[ticker]:
-                    change_pct = weekly_changes_lookup[ticker][week_ending]
-                    old_value = position_values[ticker]['value']
-                    new_value = old_value * (1 + change_pct / 100)
-                    position_values[ticker]['value'] = new_value
-
-                    position_details.append({
-                        'ticker': ticker,
-                        'value': new_value,
-                        'change_pct': change_pct,
-                        'entry_date': position_values[ticker]['entry_date'],
-                        'entry_value': position_values[ticker]['entry_value'],
-                        'gain_loss': new_value - position_values[ticker]['entry_value']
-                    })
-
-                    week_total += new_value
-                else:
-                    # No data for this week, keep previous value
-                    week_total += position_values[ticker]['value']
-                    position_details.append({
-                        'ticker': ticker,
-                        'value': position_values[ticker]['value'],
-                        'change_pct': 0,
-                        'entry_date': position_values[ticker]['entry_date'],
-                        'entry_value': position_values[ticker]['entry_value'],
-                        'gain_loss': position_values[ticker]['value'] - position_values[ticker]['entry_value']
-                    })
+        holdings[week_idx, current_rows] = True
+        held_rows[week_idx] = current_rows
+
+    (position_values, entry_week_history, cash_history,
+     capital_history, capital_added_history, sp500_history) = _run_portfolio(
+        weekly_changes, sp500_changes, holdings, initial_holdings, start_index
+    )
+
+    # Build the per-week report data from the result arrays
+    weekly_portfolio_values = []
+    for week_idx in range(start_index, len(all_weeks)):
+        position_details = []
+        for row in held_rows[week_idx]:
+            value = float(position_values[week_idx, row])
+            change_pct = weekly_changes[row, week_idx]
+            entry_week = entry_week_history[week_idx, row]
+            entry_date = all_weeks[entry_week] if entry_week >= 0 else start_week
+            position_details.append({
+                'ticker': all_tickers[row],
+                'value': value,
+                'change_pct': 0.0 if np.isnan(change_pct) else float(change_pct),
+                'entry_date': entry_date,
+                'entry_value': INITIAL_POSITION_VALUE,
+                'gain_loss': value - INITIAL_POSITION_VALUE
+            })
+
+        week_total = sum(pos['value'] for pos in position_details)
+        cash_available = float(cash_history[week_idx])
+        total_capital_invested = float(capital_history[week_idx])
+        capital_added_this_week = float(capital_added_history[week_idx])
+        sp500_value = float(sp500_history[week_idx])
 
         # Calculate true performance based on capital invested
         net_gain_loss = week_total + cash_available - total_capital_invested
         true_return_pct = (net_gain_loss / total_capital_invested) * 100
 
-        # Update S&P 500 benchmark (apply weekly return AFTER capital additions)
-        sp500_change_pct = sp500_lookup.get(week_ending, None)
-        if sp500_change_pct is not None and sp500_change_pct == sp500_change_pct:  # Check for NaN
-            sp500_value = sp500_value * (1 + sp500_change_pct / 100)
-        elif sp500_change_pct is None:
-            # No SPY data for this week - likely future date or market holiday
-            pass
-
-        sp500_net_gain_loss = sp500_value - sp500_total_capital_invested
-        sp500_return_pct = (sp500_net_gain_loss / sp500_total_capital_invested) * 100
+        # The S&P 500 benchmark receives the same capital additions as the portfolio
+        sp500_net_gain_loss = sp500_value - total_capital_invested
+        sp500_return_pct = (sp500_net_gain_loss / total_capital_invested) * 100
 
         weekly_portfolio_values.append({
-            'week_ending': week_ending,
+            'week_ending': all_weeks[week_idx],
             'total_value': week_total,
             'positions': position_details,
             'cash_available': cash_available,
@@ -300,8 +366,8 @@ def calculate_portfolio_returns(weekly_data, portfolio_history, sp500_lookup):
             'net_gain_loss': net_gain_loss,
             'true_return_pct': true_return_pct,
             'sp500_value': sp500_value,
-            'sp500_total_capital_invested': sp500_total_capital_invested,
-            'sp500_capital_added_this_week': sp500_capital_added_this_week,
+            'sp500_total_capital_invested': total_capital_invested,
+            'sp500_capital_added_this_week': capital_added_this_week,
             'sp500_net_gain_loss': sp500_net_gain_loss,
             'sp500_return_pct': sp500_return_pct
         })
@@ -309,22 +375,55 @@ def calculate_portfolio_returns(weekly_data, portfolio_history, sp500_lookup):
     return weekly_portfolio_values
 
 
-def generate_dollar_return_report(weekly_portfolio_values):
+def _format_week(week_data):
+    """
+    Format the detailed position tracking block for one week.
+    Returns the block as a single string, including the trailing blank line.
+    """
+    lines = [
+        f"Week Ending: {week_data['week_ending']}",
+        f"Portfolio Value: ${week_data['total_value']:,.2f} | "
+        f"Cash: ${week_data['cash_available']:,.2f} | "
+        f"Capital Invested: ${week_data['total_capital_invested']:,.2f}"
+    ]
+    if week_data['capital_added_this_week'] > 0:
+        lines.append(f"*** Capital Added This Week: ${week_data['capital_added_this_week']:,.2f} ***")
+    lines.append("-" * 140)
+    lines.append(
+        f"{'Ticker':<8} {'Current Value':<18} {'Week Change %':<16} "
+        f"{'Entry Date':<15} {'Entry Value':<18} {'Position Gain/Loss':<20}"
+    )
+    lines.append("-" * 140)
+
+    for pos in week_data['positions']:
+        lines.append(
+            f"{pos['ticker']:<8} ${pos['value']:>15,.2f} {pos['change_pct']:>14.2f}% "
+            f"{pos['entry_date']:<15} ${pos['entry_value']:>15,.2f} ${pos['gain_loss']:>17,.2f}"
+        )
+
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def generate_dollar_return_report(weekly_portfolio_values, out):
     """
     Generate a text report showing dollar returns over time.
+    Lines are written straight to the file-like object out.
     """
-    report_lines = []
-    report_lines.append("=" * 140)
-    report_lines.append("Rolling Portfolio Dollar Return Report")
-    report_lines.append("Portfolio Selection Based on Geometric Average Rankings")
-    report_lines.append(f"Initial Portfolio Value: ${INITIAL_PORTFOLIO_VALUE:,.2f}")
-    report_lines.append(f"Initial Position Size: ${INITIAL_POSITION_VALUE:,.2f} per position")
-    report_lines.append("=" * 140)
-    report_lines.append("")
+    def write(line=""):
+        out.write(line + "\n")
+
+    write("=" * 140)
+    write("Rolling Portfolio Dollar Return Report")
+    write("Portfolio Selection Based on Geometric Average Rankings")
+    write(f"Initial Portfolio Value: ${INITIAL_PORTFOLIO_VALUE:,.2f}")
+    write(f"Initial Position Size: ${INITIAL_POSITION_VALUE:,.2f} per position")
+    write("=" * 140)
+    write()
 
     if not weekly_portfolio_values:
-        report_lines.append("No data available")
-        return report_lines
+        write("No data available")
+        return
 
     # Summary statistics
     final_week = weekly_portfolio_values[-1]
@@ -341,40 +440,40 @@ def generate_dollar_return_report(weekly_portfolio_values):
     sp500_return_pct = final_week['sp500_return_pct']
     outperformance = true_return_pct - sp500_return_pct
 
-    report_lines.append("SUMMARY")
-    report_lines.append("-" * 140)
-    report_lines.append("Portfolio Performance:")
-    report_lines.append(f"  Initial Capital:        ${INITIAL_PORTFOLIO_VALUE:>12,.2f}")
-    report_lines.append(f"  Capital Added:          ${capital_added:>12,.2f}")
-    report_lines.append(f"  Total Capital Invested: ${total_capital_invested:>12,.2f}")
-    report_lines.append(f"  Final Portfolio Value:  ${final_value:>12,.2f}")
-    report_lines.append(f"  Cash Available:         ${final_cash:>12,.2f}")
-    report_lines.append(f"  Total Assets:           ${final_value + final_cash:>12,.2f}")
-    report_lines.append(f"  Net Gain/Loss:          ${net_gain_loss:>12,.2f}")
-    report_lines.append(f"  True Return:            {true_return_pct:>12.2f}%")
-    report_lines.append("")
-    report_lines.append("S&P 500 Benchmark (Equal Capital Invested):")
-    report_lines.append(f"  Initial Capital:        ${INITIAL_PORTFOLIO_VALUE:>12,.2f}")
-    report_lines.append(f"  Capital Added:          ${sp500_capital_added:>12,.2f}")
-    report_lines.append(f"  Total Capital Invested: ${sp500_total_capital_invested:>12,.2f}")
-    report_lines.append(f"  Final Value:            ${sp500_final_value:>12,.2f}")
-    report_lines.append(f"  Net Gain/Loss:          ${sp500_net_gain_loss:>12,.2f}")
-    report_lines.append(f"  Return:                 {sp500_return_pct:>12.2f}%")
-    report_lines.append("")
-    report_lines.append(f"Outperformance:           {outperformance:>12.2f}%")
-    report_lines.append(f"Number of Weeks:          {len(weekly_portfolio_values):>12}")
-    report_lines.append("")
+    write("SUMMARY")
+    write("-" * 140)
+    write("Portfolio Performance:")
+    write(f"  Initial Capital:        ${INITIAL_PORTFOLIO_VALUE:>12,.2f}")
+    write(f"  Capital Added:          ${capital_added:>12,.2f}")
+    write(f"  Total Capital Invested: ${total_capital_invested:>12,.2f}")
+    write(f"  Final Portfolio Value:  ${final_value:>12,.2f}")
+    write(f"  Cash Available:         ${final_cash:>12,.2f}")
+    write(f"  Total Assets:           ${final_value + final_cash:>12,.2f}")
+    write(f"  Net Gain/Loss:          ${net_gain_loss:>12,.2f}")
+    write(f"  True Return:            {true_return_pct:>12.2f}%")
+    write()
+    write("S&P 500 Benchmark (Equal Capital Invested):")
+    write(f"  Initial Capital:        ${INITIAL_PORTFOLIO_VALUE:>12,.2f}")
+    write(f"  Capital Added:          ${sp500_capital_added:>12,.2f}")
+    write(f"  Total Capital Invested: ${sp500_total_capital_invested:>12,.2f}")
+    write(f"  Final Value:            ${sp500_final_value:>12,.2f}")
+    write(f"  Net Gain/Loss:          ${sp500_net_gain_loss:>12,.2f}")
+    write(f"  Return:                 {sp500_return_pct:>12.2f}%")
+    write()
+    write(f"Outperformance:           {outperformance:>12.2f}%")
+    write(f"Number of Weeks:          {len(weekly_portfolio_values):>12}")
+    write()
 
     # Weekly portfolio values table
-    report_lines.append("=" * 180)
-    report_lines.append("Weekly Portfolio Values vs SPY (S&P 500)")
-    report_lines.append("=" * 180)
-    report_lines.append("")
-    report_lines.append(
+    write("=" * 180)
+    write("Weekly Portfolio Values vs SPY (S&P 500)")
+    write("=" * 180)
+    write()
+    write(
         f"{'Week':<12} {'Portfolio':<16} {'Port Return':<13} {'Port Capital':<16} "
         f"{'VOO Value':<16} {'VOO Return':<13} {'VOO Capital':<16} {'Outperform':<13}"
     )
-    report_lines.append("-" * 180)
+    write("-" * 180)
 
     for week_data in weekly_portfolio_values:
         week_ending = week_data['week_ending']
@@ -387,46 +486,34 @@ def generate_dollar_return_report(weekly_portfolio_values):
         voo_capital = week_data['sp500_total_capital_invested']
         outperform = true_return - voo_return
 
-        report_lines.append(
+        write(
             f"{week_ending:<12} ${total_value:>13,.2f} {true_return:>11.2f}% ${capital_invested:>13,.2f} "
             f"${voo_value:>13,.2f} {voo_return:>11.2f}% ${voo_capital:>13,.2f} {outperform:>11.2f}%"
         )
 
-    report_lines.append("")
-    report_lines.append("=" * 140)
-    report_lines.append("Detailed Position Tracking")
-    report_lines.append("=" * 140)
-    report_lines.append("")
+    write()
+    write("=" * 140)
+    write("Detailed Position Tracking")
+    write("=" * 140)
+    write()
 
     # Detailed position tracking for each week
-    for week_data in weekly_portfolio_values:
-        report_lines.append(f"Week Ending: {week_data['week_ending']}")
-        report_lines.append(
-            f"Portfolio Value: ${week_data['total_value']:,.2f} | "
-            f"Cash: ${week_data['cash_available']:,.2f} | "
-            f"Capital Invested: ${week_data['total_capital_invested']:,.2f}"
-        )
-        if week_data['capital_added_this_week'] > 0:
-            report_lines.append(f"*** Capital Added This Week: ${week_data['capital_added_this_week']:,.2f} ***")
-        report_lines.append("-" * 140)
-        report_lines.append(
-            f"{'Ticker':<8} {'Current Value':<18} {'Week Change %':<16} "
-            f"{'Entry Date':<15} {'Entry Value':<18} {'Position Gain/Loss':<20}"
-        )
-        report_lines.append("-" * 140)
-
-        for pos in week_data['positions']:
-            report_lines.append(
-                f"{pos['ticker']:<8} ${pos['value']:>15,.2f} {pos['change_pct']:>14.2f}% "
-                f"{pos['entry_date']:<15} ${pos['entry_value']:>15,.2f} ${pos['gain_loss']:>17,.2f}"
-            )
-
-        report_lines.append("")
-
-    return report_lines
+    # (formatted in worker processes for long backtests, where it dominates report time).
+    # Workers can only import _format_week when this file runs as the main script -
+    # loaded via pipeline.load_script its module name is not importable under spawn
+    if len(weekly_portfolio_values) >= PARALLEL_REPORT_MIN_WEEKS and __name__ == "__main__":
+        with ProcessPoolExecutor() as executor:
+            for block in executor.map(_format_week, weekly_portfolio_values, chunksize=16):
+                out.write(block)
+    else:
+        for week_data in weekly_portfolio_values:
+            out.write(_format_week(week_data))
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:].
+    """
     # Set up argument parser
     parser = argparse.ArgumentParser(
         description='Calculate dollar returns for running portfolio'
@@ -437,7 +524,7 @@ if __name__ == "__main__":
                         help='Running portfolio JSON file (need to create this output from running-portfolio.py)')
     parser.add_argument('-o', '--output', action='store_true',
                         help='Write output to file in output/ directory')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Read weekly performance JSON
     weekly_path = Path(args.weekly)
@@ -445,8 +532,8 @@ if __name__ == "__main__":
         print(f"Error: Weekly performance file '{args.weekly}' not found")
         exit(1)
 
-    with open(weekly_path, 'r') as f:
-        weekly_data = json.load(f)
+    with open(weekly_path, 'r', encoding='utf-8') as f:
+        weekly_data = jsonio.load(f)
 
     # Read portfolio history JSON
     portfolio_path = Path(args.portfolio)
@@ -455,8 +542,8 @@ if __name__ == "__main__":
         print("Note: You need to modify running-portfolio.py to output JSON, or provide the rolling-performance.json file")
         exit(1)
 
-    with open(portfolio_path, 'r') as f:
-        portfolio_data = json.load(f)
+    with open(portfolio_path, 'r', encoding='utf-8') as f:
+        portfolio_data = jsonio.load(f)
 
     # Check if this is rolling-performance data (has top_10_etfs) or portfolio history
     # For now, we'll need to calculate portfolio history from rolling-performance
@@ -466,34 +553,16 @@ if __name__ == "__main__":
     else:
         portfolio_history = portfolio_data
 
-    # Fetch S&P 500 data for comparison
-    if weekly_data:
-        from datetime import datetime
-        start_date = weekly_data[0]['week_ending']
-        end_date = weekly_data[-1]['week_ending']
-        today = datetime.now().strftime('%Y-%m-%d')
-
-        print(f"Fetching SPY data from {start_date} to {end_date}...")
-        print(f"Today's date: {today}")
-
-        # If end date is in the future, use today instead
-        if end_date > today:
-            print(f"WARNING: End date {end_date} is in the future. Using today ({today}) instead.")
-            end_date = today
-
-        sp500_lookup = fetch_sp500_returns(start_date, end_date)
-        print(f"Sample SPY dates: {list(sp500_lookup.keys())[:5]}")
-        print(f"Sample weekly dates: {[w['week_ending'] for w in weekly_data[:5]]}")
-    else:
-        sp500_lookup = {}
+    # Use the SPY data downloaded with the weekly data, fetching it only for older files
+    sp500_lookup = build_sp500_lookup(weekly_data)
+    if sp500_lookup:
+        print(f"Using SPY benchmark data from {args.weekly}")
+    elif weekly_data:
+        sp500_lookup = fetch_sp500_for_weeks(weekly_data)
 
     # Calculate returns
     weekly_portfolio_values = calculate_portfolio_returns(weekly_data, portfolio_history, sp500_lookup)
 
-    # Generate report
-    report_lines = generate_dollar_return_report(weekly_portfolio_values)
-    report_content = "\n".join(report_lines)
-
     # Output to file or console
     if args.output:
         # Create output directory if it doesn't exist
@@ -503,16 +572,19 @@ if __name__ == "__main__":
         # Format filename using most recent week
         if weekly_portfolio_values:
             latest_date = weekly_portfolio_values[-1]['week_ending']
-            date_obj = datetime.strptime(latest_date, '%Y-%m-%d')
-            filename = f"report-dollar-return-{date_obj.strftime('%Y-%m-%d')}.txt"
+            filename = f"report-dollar-return-{latest_date}.txt"
         else:
             filename = f"report-dollar-return-{datetime.now().strftime('%Y-%m-%d')}.txt"
 
         filepath = output_dir / filename
 
-        with open(filepath, 'w') as f:
-            f.write(report_content)
+        # Generate report directly into a large write buffer
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            generate_dollar_return_report(weekly_portfolio_values, f)
 
         print(f"Dollar return report written to {filepath}")
     else:
-        print(report_content)
+        generate_dollar_return_report(weekly_portfolio_values, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-import json
+import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
+import jsonio
+
+# Top 10 table header and row format, built once and reused for every row
+TOP_10_HEADER = f"{'Rank':<6} {'Ticker':<8} {'Geo Avg %':<14} {'Weeks Positive':<16} {'Most Recent %':<16}"
+format_top_10_row = "{:<6} {:<8} {:>12.2f}% {:<16} {:>14.2f}%".format
 
 def generate_rolling_report(rolling_data):
     """
@@ -46,7 +51,7 @@ def generate_rolling_report(rolling_data):
         report_lines.append("-" * 80)
 
         # Table header for detailed view
-        report_lines.append(f"{'Rank':<6} {'Ticker':<8} {'Geo Avg %':<14} {'Weeks Positive':<16} {'Most Recent %':<16}")
+        report_lines.append(TOP_10_HEADER)
         report_lines.append("-" * 80)
 
         # Add each ETF
@@ -56,22 +61,23 @@ def generate_rolling_report(rolling_data):
             weeks_pos = etf['weeks_positive']
             recent_change = etf['most_recent_change']
 
-            report_lines.append(
-                f"{rank:<6} {ticker:<8} {geo_avg:>12.2f}% {weeks_pos:<16} {recent_change:>14.2f}%"
-            )
+            report_lines.append(format_top_10_row(rank, ticker, geo_avg, weeks_pos, recent_change))
 
         report_lines.append("")
 
     return report_lines
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:].
+    """
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Generate text report from rolling performance JSON')
     parser.add_argument('-i', '--input', type=str, required=True,
                         help='Input JSON file path (e.g., output/rolling-performance-02-27-2026.json)')
     parser.add_argument('-o', '--output', action='store_true',
                         help='Write output to file in output/ directory')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Read input JSON file
     input_path = Path(args.input)
@@ -79,12 +85,11 @@ if __name__ == "__main__":
         print(f"Error: Input file '{args.input}' not found")
         exit(1)
 
-    with open(input_path, 'r') as f:
-        rolling_data = json.load(f)
+    with open(input_path, 'r', encoding='utf-8') as f:
+        rolling_data = jsonio.load(f)
 
     # Generate report
     report_lines = generate_rolling_report(rolling_data)
-    report_content = "\n".join(report_lines)
 
     # Output to file or console
     if args.output:
@@ -95,16 +100,19 @@ if __name__ == "__main__":
         # Format filename using most recent period end date
         if rolling_data:
             latest_date = rolling_data[-1]['period_end']
-            date_obj = datetime.strptime(latest_date, '%Y-%m-%d')
-            filename = f"report-rolling-performance-{date_obj.strftime('%Y-%m-%d')}.txt"
+            filename = f"report-rolling-performance-{latest_date}.txt"
         else:
             filename = f"report-rolling-performance-{datetime.now().strftime('%Y-%m-%d')}.txt"
 
         filepath = output_dir / filename
 
-        with open(filepath, 'w') as f:
-            f.write(report_content)
+        # Stream the lines through the file buffer instead of joining one big string
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.writelines(f"{line}\n" for line in report_lines)
 
         print(f"Report written to {filepath}")
     else:
-        print(report_content)
+        sys.stdout.writelines(f"{line}\n" for line in report_lines)
+
+if __name__ == "__main__":
+    main()
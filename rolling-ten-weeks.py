@@ -1,30 +1,45 @@
-import json
+import heapq
 import argparse
 import numpy as np
 from pathlib import Path
 from datetime import datetime
+import jsonio
 
-def calculate_geometric_average(changes):
+def _window_sums(values, window=10):
     """
-    Calculate geometric average return from a list of percentage returns.
-    Formula: [(1 + r1/100) * (1 + r2/100) * ... * (1 + rn/100)]^(1/n) - 1
-    Returns percentage value.
+    Sum values over every window of consecutive rows.
+    Uses a cumulative sum with a leading zero row, so each window total is
+    the difference of two rows instead of a rescan of the whole window.
     """
-    if not changes or all(c is None for c in changes):
-        return None
+    cumulative = np.zeros((values.shape[0] + 1, values.shape[1]), dtype=np.result_type(values, np.int64))
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    return cumulative[window:] - cumulative[:-window]
 
-    # Filter out None values
-    valid_changes = [c for c in changes if c is not None]
-    if len(valid_changes) == 0:
-        return None
+def _score_windows(changes, window=10):
+    """
+    Score every rolling window of a (weeks x tickers) array of weekly changes.
+    NaN marks weeks without data for a ticker.
+
+    Returns (windows x tickers) arrays of weeks with data, weeks positive,
+    geometric average and most recent change, one row per window.
+    """
+    valid = ~np.isnan(changes)
+    weeks_present = _window_sums(valid, window)
+    weeks_positive = _window_sums(changes > 0, window)
+    # Log returns, 0.0 where there is no data, so window sums only count weeks with data
+    log_returns = np.log1p(changes / 100, out=np.zeros_like(changes), where=valid)
+    log_sums = _window_sums(log_returns, window)
 
-    # Convert percentage to decimal, add 1, multiply together
-    product = np.prod([1 + c / 100 for c in valid_changes])
+    # Geometric average: [(1 + r1/100) * ... * (1 + rn/100)]^(1/n) - 1, as a percentage
+    with np.errstate(divide='ignore', invalid='ignore'):
+        geo_avgs = np.expm1(log_sums / weeks_present) * 100
 
-    # Take nth root and subtract 1, convert back to percentage
-    geo_avg = (product ** (1 / len(valid_changes)) - 1) * 100
+    # Row of the most recent week with data for each ticker, up to and including each week
+    rows = np.arange(changes.shape[0])[:, np.newaxis]
+    last_rows = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)[window - 1:]
+    recent_changes = np.take_along_axis(changes, np.maximum(last_rows, 0), axis=0)
 
-    return geo_avg
+    return weeks_present, weeks_positive, geo_avgs, recent_changes
 
 def calculate_rolling_ten_week_scores(weekly_data):
     """
@@ -35,92 +50,85 @@ def calculate_rolling_ten_week_scores(weekly_data):
     if len(weekly_data) < 10:
         raise ValueError(f"Need at least 10 weeks of data, got {len(weekly_data)}")
 
+    week_endings = [week['week_ending'] for week in weekly_data]
+    tickers = sorted({etf['ticker'] for week in weekly_data for etf in week['etfs']})
+    ticker_idx = {ticker: i for i, ticker in enumerate(tickers)}
+
+    # Pivot the weekly data into a (weeks x tickers) array, NaN where an ETF has no data
+    changes = np.full((len(weekly_data), len(tickers)), np.nan)
+    for row, week in enumerate(weekly_data):
+        for etf in week['etfs']:
+            changes[row, ticker_idx[etf['ticker']]] = etf['change_percent']
+
+    # The rounded weekly change entries are built once and shared by every
+    # window that includes the week, rather than rebuilt for each window
+    change_entries = [
+        [
+            {'change': change, 'week_ending': week_ending} if has_data else None
+            for change, has_data in zip(change_row, valid_row)
+        ]
+        for change_row, valid_row, week_ending in zip(
+            np.round(changes, 2).tolist(), (~np.isnan(changes)).tolist(), week_endings
+        )
+    ]
+
+    # Score every 10-week window at once (one row per window)
+    weeks_present, weeks_positive, geo_avgs, recent_changes = _score_windows(changes)
+
+    # Round the reported values for all windows at once
+    geo_avgs_rounded = np.round(geo_avgs, 2)
+    recent_changes_rounded = np.round(recent_changes, 2)
+
     rolling_results = []
 
     # Calculate for each possible 10-week window
     for i in range(len(weekly_data) - 9):
-        window = weekly_data[i:i+10]
-
-        # Get the date range for this window
-        start_date = window[0]['week_ending']
-        end_date = window[-1]['week_ending']
-
-        # Build a dictionary to track each ETF's performance
-        etf_scores = {}
-
-        # Process each week in the window
-        for week in window:
-            week_ending = week['week_ending']
-            for etf in week['etfs']:
-                ticker = etf['ticker']
-                change_percent = etf['change_percent']
-
-                if ticker not in etf_scores:
-                    etf_scores[ticker] = {
-                        'ticker': ticker,
-                        'weeks_positive': 0,
-                        'weekly_changes': []
-                    }
-
-                etf_scores[ticker]['weekly_changes'].append({
-                    'change': change_percent,
-                    'week_ending': week_ending
-                })
-                if change_percent > 0:
-                    etf_scores[ticker]['weeks_positive'] += 1
-
-        # Convert to list and calculate geometric average for each ETF
-        etf_list = []
-        for ticker, data in etf_scores.items():
-            changes = [w['change'] for w in data['weekly_changes']]
-            geo_avg = calculate_geometric_average(changes)
-
-            etf_list.append({
-                'ticker': ticker,
-                'geometric_avg': geo_avg,
-                'weeks_positive': data['weeks_positive'],
-                'most_recent_change': data['weekly_changes'][-1]['change'],
-                'weekly_changes': data['weekly_changes']
-            })
-
-        # Sort by geometric_avg (descending), then by weeks_positive (descending)
-        etf_list.sort(key=lambda x: (x['geometric_avg'] if x['geometric_avg'] is not None else -float('inf'), x['weeks_positive']), reverse=True)
-
-        # Get top 10
-        top_10 = etf_list[:10]
+        end = i + 9
+        geo_row = geo_avgs[i].tolist()
+        positive_row = weeks_positive[i].tolist()
+        geo_rounded_row = geo_avgs_rounded[i].tolist()
+        recent_rounded_row = recent_changes_rounded[i].tolist()
+
+        # Get top 10 ETFs with data in this window by geometric_avg (descending), then by weeks_positive (descending)
+        top_10 = heapq.nlargest(
+            10,
+            np.flatnonzero(weeks_present[i]).tolist(),
+            key=lambda j: (geo_row[j], positive_row[j])
+        )
 
         # Format the result for this rolling period
         rolling_results.append({
-            'period_start': start_date,
-            'period_end': end_date,
+            'period_start': week_endings[i],
+            'period_end': week_endings[end],
             'top_10_etfs': [
                 {
-                    'ticker': etf['ticker'],
-                    'geometric_avg': round(etf['geometric_avg'], 2) if etf['geometric_avg'] is not None else None,
-                    'weeks_positive': etf['weeks_positive'],
-                    'most_recent_change': round(etf['most_recent_change'], 2),
+                    'ticker': tickers[j],
+                    'geometric_avg': geo_rounded_row[j],
+                    'weeks_positive': positive_row[j],
+                    'most_recent_change': recent_rounded_row[j],
                     'weekly_changes': [
-                        {
-                            'change': round(w['change'], 2),
-                            'week_ending': w['week_ending']
-                        }
-                        for w in etf['weekly_changes']
+                        change_entries[k][j]
+                        for k in range(i, end + 1)
+                        if change_entries[k][j] is not None
                     ]
                 }
-                for etf in top_10
+                for j in top_10
             ]
         })
 
     return rolling_results
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:].
+    """
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Calculate rolling 10-week scores from weekly performance JSON')
     parser.add_argument('-i', '--input', type=str, required=True,
                         help='Input JSON file path (e.g., output/weekly-performance-02-27-2026.json)')
     parser.add_argument('-o', '--output', action='store_true',
                         help='Write output to file in output/ directory')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Read input JSON file
     input_path = Path(args.input)
@@ -128,8 +136,8 @@ if __name__ == "__main__":
         print(f"Error: Input file '{args.input}' not found")
         exit(1)
 
-    with open(input_path, 'r') as f:
-        weekly_data = json.load(f)
+    with open(input_path, 'r', encoding='utf-8') as f:
+        weekly_data = jsonio.load(f)
 
     # Calculate rolling scores
     try:
@@ -139,7 +147,7 @@ if __name__ == "__main__":
         exit(1)
 
     # Convert to JSON
-    json_output = json.dumps(rolling_scores, indent=2)
+    json_output = jsonio.dumps(rolling_scores)
 
     # Output to file or console
     if args.output:
@@ -150,16 +158,18 @@ if __name__ == "__main__":
         # Format filename using most recent period end date
         if rolling_scores:
             latest_date = rolling_scores[-1]['period_end']
-            date_obj = datetime.strptime(latest_date, '%Y-%m-%d')
-            filename = f"rolling-performance-{date_obj.strftime('%Y-%m-%d')}.json"
+            filename = f"rolling-performance-{latest_date}.json"
         else:
             filename = f"rolling-performance-{datetime.now().strftime('%Y-%m-%d')}.json"
 
         filepath = output_dir / filename
 
-        with open(filepath, 'w') as f:
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 20) as f:
             f.write(json_output)
 
         print(f"Rolling performance data written to {filepath}")
     else:
         print(json_output)
+
+if __name__ == "__main__":
+    main()
@@ -13,37 +13,46 @@ Usage:
     python run-analysis.py
 """
 
-import subprocess
+import io
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime
+from pipeline import load_script
 
-def run_command(description, command):
-    """Run a command and handle errors."""
+def run_command(description, script, args):
+    """Run a pipeline script's main() in this process and handle errors."""
     print("=" * 80)
     print(f"STEP: {description}")
     print("=" * 80)
-    print(f"Running: {' '.join(command)}")
+    print(f"Running: python {' '.join([script, *args])}")
     print()
 
     try:
-        result = subprocess.run(
-            command,
-            check=True,
-            capture_output=False,
-            text=True
-        )
+        load_script(script).main(args)
         print(f"✓ {description} completed successfully")
         print()
         return True
-    except subprocess.CalledProcessError as e:
+    except SystemExit as e:
+        if e.code in (None, 0):
+            print(f"✓ {description} completed successfully")
+            print()
+            return True
         print(f"✗ Error in {description}")
-        print(f"Command failed with exit code {e.returncode}")
+        print(f"Command failed with exit code {e.code}")
         return False
     except Exception as e:
         print(f"✗ Unexpected error in {description}: {e}")
         return False
 
+def run_command_captured(description, script, args):
+    """Run a pipeline step, returning its success and captured console output."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        success = run_command(description, script, args)
+    return success, output.getvalue()
+
 def main():
     """Run the complete analysis pipeline."""
     print("=" * 80)
@@ -59,7 +68,7 @@ def main():
     # Step 1: Fetch historical weekly performance data (52 weeks)
     if not run_command(
         "Fetching 52 weeks of historical ETF performance data",
-        ["python", "historical-price-change.py", "-w", "52", "-o"]
+        "historical-price-change.py", ["-w", "52", "-o"]
     ):
         print("Pipeline failed at step 1")
         sys.exit(1)
@@ -77,7 +86,7 @@ def main():
     # Step 2: Calculate rolling 10-week scores
     if not run_command(
         "Calculating rolling 10-week scores for top 10 ETFs",
-        ["python", "rolling-ten-weeks.py", "-i", str(weekly_file), "-o"]
+        "rolling-ten-weeks.py", ["-i", str(weekly_file), "-o"]
     ):
         print("Pipeline failed at step 2")
         sys.exit(1)
@@ -92,29 +101,32 @@ def main():
     print(f"Using rolling performance file: {rolling_file}")
     print()
 
-    # Step 3: Generate rolling performance report
-    if not run_command(
-        "Generating rolling performance report (top 10 by period)",
-        ["python", "rolling-ten-weeks-report.py", "-i", str(rolling_file), "-o"]
-    ):
-        print("Pipeline failed at step 3")
-        sys.exit(1)
-
-    # Step 4: Calculate running portfolio with momentum strategy
-    if not run_command(
-        "Calculating running portfolio with momentum strategy",
-        ["python", "running-portfolio.py", "-i", str(rolling_file), "-o"]
-    ):
-        print("Pipeline failed at step 4")
-        sys.exit(1)
-
-    # Step 5: Calculate dollar returns with SPY benchmark
-    if not run_command(
-        "Calculating dollar returns with SPY benchmark comparison",
-        ["python", "rolling-dollar-return.py", "-w", str(weekly_file), "-p", str(rolling_file), "-o"]
-    ):
-        print("Pipeline failed at step 5")
-        sys.exit(1)
+    # Steps 3-5 only read the weekly and rolling files, so run them in parallel
+    parallel_steps = [
+        # Step 3: Generate rolling performance report
+        (3, "Generating rolling performance report (top 10 by period)",
+         "rolling-ten-weeks-report.py", ["-i", str(rolling_file), "-o"]),
+        # Step 4: Calculate running portfolio with momentum strategy
+        (4, "Calculating running portfolio with momentum strategy",
+         "running-portfolio.py", ["-i", str(rolling_file), "-o"]),
+        # Step 5: Calculate dollar returns with SPY benchmark
+        (5, "Calculating dollar returns with SPY benchmark comparison",
+         "rolling-dollar-return.py", ["-w", str(weekly_file), "-p", str(rolling_file), "-o"]),
+    ]
+
+    with ProcessPoolExecutor(max_workers=len(parallel_steps)) as executor:
+        futures = [
+            executor.submit(run_command_captured, description, script, args)
+            for _, description, script, args in parallel_steps
+        ]
+        results = [future.result() for future in futures]
+
+    # Print each step's output in order once all have finished
+    for (step, *_), (success, output) in zip(parallel_steps, results):
+        print(output, end="")
+        if not success:
+            print(f"Pipeline failed at step {step}")
+            sys.exit(1)
 
     # Summary
     print("=" * 80)
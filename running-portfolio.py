@@ -1,7 +1,13 @@
-import json
+import io
+import sys
 import argparse
 from pathlib import Path
 from datetime import datetime
+import jsonio
+
+# Top 10 table header and row format, built once and reused for every row
+TOP_10_HEADER = f"{'Rank':<6} {'Ticker':<8} {'Geo Avg %':<14} {'Weeks Positive':<16} {'Most Recent %':<16}"
+format_top_10_row = "{:<6} {:<8} {:>12.2f}% {:<16} {:>14.2f}%".format
 
 def calculate_running_portfolio(rolling_data):
     """
@@ -33,9 +39,21 @@ def calculate_running_portfolio(rolling_data):
         }
     })
 
+    # Each ticker gets one bit, so top 10 and holdings membership checks are
+    # bitwise ANDs on plain ints (the lists keep the ranking/holding order)
+    ticker_bits = {}
+
+    def bit(ticker):
+        if ticker not in ticker_bits:
+            ticker_bits[ticker] = 1 << len(ticker_bits)
+        return ticker_bits[ticker]
+
     # Process each subsequent period
     for period in rolling_data[1:]:
         top_10_tickers = [etf['ticker'] for etf in period['top_10_etfs']]
+        top_10_mask = 0
+        for ticker in top_10_tickers:
+            top_10_mask |= bit(ticker)
 
         # Track changes
         added = []
@@ -43,9 +61,11 @@ def calculate_running_portfolio(rolling_data):
 
         # Check which current holdings are still in top 10
         new_portfolio = []
+        new_mask = 0
         for ticker in current_portfolio:
-            if ticker in top_10_tickers:
+            if bit(ticker) & top_10_mask:
                 new_portfolio.append(ticker)
+                new_mask |= ticker_bits[ticker]
             else:
                 dropped.append(ticker)
 
@@ -54,8 +74,9 @@ def calculate_running_portfolio(rolling_data):
         for ticker in top_10_tickers:
             if slots_to_fill == 0:
                 break
-            if ticker not in new_portfolio:
+            if not ticker_bits[ticker] & new_mask:
                 new_portfolio.append(ticker)
+                new_mask |= ticker_bits[ticker]
                 added.append(ticker)
                 slots_to_fill -= 1
 
@@ -78,25 +99,31 @@ def generate_portfolio_report(portfolio_history, rolling_data):
     """
     Generate a text report from portfolio history.
     Includes top 10 reference data for verification.
+    Returns the report text, built in a single string buffer.
     """
-    report_lines = []
-    report_lines.append("=" * 100)
-    report_lines.append("Running Portfolio Report")
-    report_lines.append("Maintains Top 5 ETFs with Momentum-Based Rotation (by Geometric Average)")
-    report_lines.append("=" * 100)
-    report_lines.append("")
-    report_lines.append("Rules:")
-    report_lines.append("  - Start with top 5 from first period (ranked by geometric average)")
-    report_lines.append("  - Keep holdings if they remain in top 10")
-    report_lines.append("  - Drop holdings that fall out of top 10")
-    report_lines.append("  - Fill empty slots with highest ranked ETFs not already held")
-    report_lines.append("")
-    report_lines.append("=" * 100)
-    report_lines.append("")
+    buf = io.StringIO()
+
+    def write(line=""):
+        buf.write(line)
+        buf.write("\n")
+
+    write("=" * 100)
+    write("Running Portfolio Report")
+    write("Maintains Top 5 ETFs with Momentum-Based Rotation (by Geometric Average)")
+    write("=" * 100)
+    write()
+    write("Rules:")
+    write("  - Start with top 5 from first period (ranked by geometric average)")
+    write("  - Keep holdings if they remain in top 10")
+    write("  - Drop holdings that fall out of top 10")
+    write("  - Fill empty slots with highest ranked ETFs not already held")
+    write()
+    write("=" * 100)
+    write()
 
     # Create summary table
-    report_lines.append(f"{'Period':<30} | {'Portfolio (5 ETFs)':<40} | {'Changes'}")
-    report_lines.append("-" * 100)
+    write(f"{'Period':<30} | {'Portfolio (5 ETFs)':<40} | {'Changes'}")
+    write("-" * 100)
 
     for entry in portfolio_history:
         period_str = f"{entry['period_start']} - {entry['period_end']}"
@@ -111,40 +138,40 @@ def generate_portfolio_report(portfolio_history, rolling_data):
 
         changes_str = " ".join(changes_parts) if changes_parts else "No changes"
 
-        report_lines.append(f"{period_str:<30} | {portfolio_str:<40} | {changes_str}")
+        write(f"{period_str:<30} | {portfolio_str:<40} | {changes_str}")
 
-    report_lines.append("")
-    report_lines.append("=" * 100)
-    report_lines.append("Detailed Period Breakdown")
-    report_lines.append("=" * 100)
-    report_lines.append("")
+    write()
+    write("=" * 100)
+    write("Detailed Period Breakdown")
+    write("=" * 100)
+    write()
 
     # Detailed breakdown
     for entry in portfolio_history:
-        report_lines.append(f"Period: {entry['period_start']} to {entry['period_end']}")
-        report_lines.append("-" * 100)
-        report_lines.append(f"Portfolio: {', '.join(entry['portfolio'])}")
+        write(f"Period: {entry['period_start']} to {entry['period_end']}")
+        write("-" * 100)
+        write(f"Portfolio: {', '.join(entry['portfolio'])}")
 
         if entry['changes']['added']:
-            report_lines.append(f"Added:    {', '.join(entry['changes']['added'])}")
+            write(f"Added:    {', '.join(entry['changes']['added'])}")
         if entry['changes']['dropped']:
-            report_lines.append(f"Dropped:  {', '.join(entry['changes']['dropped'])}")
+            write(f"Dropped:  {', '.join(entry['changes']['dropped'])}")
         if not entry['changes']['added'] and not entry['changes']['dropped']:
-            report_lines.append("No changes from previous period")
+            write("No changes from previous period")
 
-        report_lines.append("")
+        write()
 
-    report_lines.append("=" * 100)
-    report_lines.append("Top 10 Reference Data (for verification)")
-    report_lines.append("=" * 100)
-    report_lines.append("")
+    write("=" * 100)
+    write("Top 10 Reference Data (for verification)")
+    write("=" * 100)
+    write()
 
     # Add top 10 for each period
     for period in rolling_data:
-        report_lines.append(f"Period: {period['period_start']} to {period['period_end']}")
-        report_lines.append("-" * 100)
-        report_lines.append(f"{'Rank':<6} {'Ticker':<8} {'Geo Avg %':<14} {'Weeks Positive':<16} {'Most Recent %':<16}")
-        report_lines.append("-" * 100)
+        write(f"Period: {period['period_start']} to {period['period_end']}")
+        write("-" * 100)
+        write(TOP_10_HEADER)
+        write("-" * 100)
 
         for rank, etf in enumerate(period['top_10_etfs'], 1):
             ticker = etf['ticker']
@@ -152,15 +179,16 @@ def generate_portfolio_report(portfolio_history, rolling_data):
             weeks_pos = etf['weeks_positive']
             recent_change = etf['most_recent_change']
 
-            report_lines.append(
-                f"{rank:<6} {ticker:<8} {geo_avg:>12.2f}% {weeks_pos:<16} {recent_change:>14.2f}%"
-            )
+            write(format_top_10_row(rank, ticker, geo_avg, weeks_pos, recent_change))
 
-        report_lines.append("")
+        write()
 
-    return report_lines
+    return buf.getvalue()
 
-if __name__ == "__main__":
+def main(argv=None):
+    """
+    Command line entry point. argv defaults to sys.argv[1:].
+    """
     # Set up argument parser
     parser = argparse.ArgumentParser(
         description='Generate running portfolio from rolling performance data'
@@ -169,7 +197,7 @@ if __name__ == "__main__":
                         help='Input JSON file path (e.g., output/rolling-performance-02-27-2026.json)')
     parser.add_argument('-o', '--output', action='store_true',
                         help='Write output to file in output/ directory')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Read input JSON file
     input_path = Path(args.input)
@@ -177,15 +205,14 @@ if __name__ == "__main__":
         print(f"Error: Input file '{args.input}' not found")
         exit(1)
 
-    with open(input_path, 'r') as f:
-        rolling_data = json.load(f)
+    with open(input_path, 'r', encoding='utf-8') as f:
+        rolling_data = jsonio.load(f)
 
     # Calculate running portfolio
     portfolio_history = calculate_running_portfolio(rolling_data)
 
     # Generate report
-    report_lines = generate_portfolio_report(portfolio_history, rolling_data)
-    report_content = "\n".join(report_lines)
+    report_content = generate_portfolio_report(portfolio_history, rolling_data)
 
     # Output to file or console
     if args.output:
@@ -196,16 +223,18 @@ if __name__ == "__main__":
         # Format filename using most recent period end date
         if portfolio_history:
             latest_date = portfolio_history[-1]['period_end']
-            date_obj = datetime.strptime(latest_date, '%Y-%m-%d')
-            filename = f"report-running-portfolio-{date_obj.strftime('%Y-%m-%d')}.txt"
+            filename = f"report-running-portfolio-{latest_date}.txt"
         else:
             filename = f"report-running-portfolio-{datetime.now().strftime('%Y-%m-%d')}.txt"
 
         filepath = output_dir / filename
 
-        with open(filepath, 'w') as f:
+        with open(filepath, 'w', encoding='utf-8', buffering=1 << 16) as f:
             f.write(report_content)
 
         print(f"Running portfolio report written to {filepath}")
     else:
-        print(report_content)
+        sys.stdout.write(report_content)
+
+if __name__ == "__main__":
+    main()
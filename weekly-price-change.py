@@ -1,90 +1,28 @@
-import yfinance as yf
 import pandas as pd
+import numpy as np
 import argparse
+from etf_weekly import etf_list, etf_names, FULL_LEGEND
+import etf_weekly
 
 def get_weekly_etf_performance(tickers, num_weeks=1):
-    # Download enough historical data to cover the requested weeks
-    # We need num_weeks + 1 data points to calculate num_weeks of changes
-    period = f"{max(3, (num_weeks + 2) // 4)}mo"  # Ensure we have enough data
-    df = yf.download(tickers, period=period, interval="1wk", progress=False)
+    recent_changes = etf_weekly.fetch_pct_changes(tuple(tickers), num_weeks)
 
-    # Use 'Adj Close' if available, otherwise fall back to 'Close'
-    if 'Adj Close' in df.columns.levels[0]:
-        data = df['Adj Close']
-    else:
-        data = df['Close']
+    # Create a DataFrame with ETF tickers and one column per week (most recent first),
+    # transposing the whole block of weekly changes at once
+    weeks_block = recent_changes.iloc[::-1].round(2).T
+    weeks_block.columns = etf_weekly.week_labels(weeks_block.shape[1])
 
-    # Calculate percentage change for each week
-    # pct_change() returns decimal (0.01), so we multiply by 100 for percentage (1.0%)
-    pct_changes = data.pct_change() * 100
+    # Sort by the most recent week (Week 1, descending, NaN last) with one argsort
+    # and build the result rows in that order
+    order = np.argsort(-weeks_block.iloc[:, 0].to_numpy(), kind='stable')
+    results = weeks_block.iloc[order].rename_axis('ETF Ticker').reset_index()
 
-    # Get the last num_weeks of changes
-    recent_changes = pct_changes.iloc[-num_weeks:]
-
-    # Create a DataFrame with ETF tickers and multiple week columns
-    results = pd.DataFrame({'ETF Ticker': data.columns})
-
-    # Add each week as a column (most recent first)
-    for i, (idx, row) in enumerate(recent_changes.iloc[::-1].iterrows()):
-        week_label = f"Week {i+1}" if i > 0 else "Week 1 (Latest)"
-        results[week_label] = row.values.round(2)
-
-    # Count number of positive weeks
-    week_columns = [col for col in results.columns if col.startswith('Week')]
-    results['Weeks Positive'] = (results[week_columns] > 0).sum(axis=1)
-
-    # Reorder columns to put Weeks Positive after ETF Ticker
-    cols = ['ETF Ticker', 'Weeks Positive'] + week_columns
-    results = results[cols]
-
-    # Sort by the most recent week (Week 1)
-    results = results.sort_values(by='Week 1 (Latest)', ascending=False)
+    # Count number of positive weeks on the plain array of displayed (rounded) changes,
+    # placed after ETF Ticker
+    results.insert(1, 'Weeks Positive', (weeks_block.to_numpy()[order] > 0).sum(axis=1))
 
     return results
 
-# List of ETFs to track
-etf_list = [
-    "XRT", "XSW", "XTN", "XNTK", "XPH", "XOP", "XES", "KRE", "KCE", "KIE",
-    "XHS", "XHE", "KBE", "RWR", "XBI", "XLB", "XLI", "XLRE", "XLU", "XLK",
-    "XLF", "XLG", "XAR", "XLC", "XLP", "XLV", "XME", "XSD", "XTL", "XLY",
-    "XHB", "XLE"
-]
-
-# ETF names for legend
-etf_names = {
-    "XRT": "SPDR S&P Retail ETF",
-    "XSW": "SPDR S&P Software & Services ETF",
-    "XTN": "SPDR S&P Transportation ETF",
-    "XNTK": "SPDR NYSE Technology ETF",
-    "XPH": "SPDR S&P Pharmaceuticals ETF",
-    "XOP": "SPDR S&P Oil & Gas Exploration & Production ETF",
-    "XES": "SPDR S&P Oil & Gas Equipment & Services ETF",
-    "KRE": "SPDR S&P Regional Banking ETF",
-    "KCE": "SPDR S&P Capital Markets ETF",
-    "KIE": "SPDR S&P Insurance ETF",
-    "XHS": "SPDR S&P Health Care Services ETF",
-    "XHE": "SPDR S&P Health Care Equipment ETF",
-    "KBE": "SPDR S&P Bank ETF",
-    "RWR": "SPDR Dow Jones REIT ETF",
-    "XBI": "SPDR S&P Biotech ETF",
-    "XLB": "Materials Select Sector SPDR Fund",
-    "XLI": "Industrial Select Sector SPDR Fund",
-    "XLRE": "Real Estate Select Sector SPDR Fund",
-    "XLU": "Utilities Select Sector SPDR Fund",
-    "XLK": "Technology Select Sector SPDR Fund",
-    "XLF": "Financial Select Sector SPDR Fund",
-    "XLG": "Invesco S&P 500 Top 50 ETF",
-    "XAR": "SPDR S&P Aerospace & Defense ETF",
-    "XLC": "Communication Services Select Sector SPDR Fund",
-    "XLP": "Consumer Staples Select Sector SPDR Fund",
-    "XLV": "Health Care Select Sector SPDR Fund",
-    "XME": "SPDR S&P Metals & Mining ETF",
-    "XSD": "SPDR S&P Semiconductor ETF",
-    "XTL": "SPDR S&P Telecom ETF",
-    "XLY": "Consumer Discretionary Select Sector SPDR Fund",
-    "XHB": "SPDR S&P Homebuilders ETF",
-    "XLE": "Energy Select Sector SPDR Fund"
-}
 
 if __name__ == "__main__":
     # Set up argument parser
@@ -103,7 +41,7 @@ if __name__ == "__main__":
 
     # Display top 5 by Weeks Positive FIRST
     print(f"--- Top 5 ETFs by Weeks Positive ({args.weeks} weeks) ---")
-    top_5 = performance.sort_values(by='Weeks Positive', ascending=False).head(5)
+    top_5 = performance.iloc[np.argsort(-performance['Weeks Positive'].to_numpy(), kind='stable')[:5]]
     print(top_5.to_string(index=False))
 
     # Display legend for top 5
@@ -117,5 +55,4 @@ if __name__ == "__main__":
 
     # Display full legend
     print("\n--- Complete ETF Legend ---")
-    for ticker in sorted(etf_list):
-        print(f"{ticker:6} - {etf_names[ticker]}")
+    print(FULL_LEGEND)
@@ -0,0 +1,111 @@
+"""
+Shared Yahoo Finance download helper.
+
+Wraps yf.download with the on-disk cache, a capped download thread pool
+and retries for transient network errors, so every script fetches data
+the same way.
+"""
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from datetime import timedelta
+import cache
+
+# Maximum number of download threads per request
+MAX_THREADS = 10
+
+# Relative tolerance when comparing re-downloaded prices with the stored history
+OVERLAP_RTOL = 1e-4
+
+# Retry transient network errors (timeouts, dropped connections)
+yf.config.network.retries = 3
+
+def download(tickers, use_cache=True, **kwargs):
+    """
+    Download price data via yf.download, reusing a cached copy when available.
+    With use_cache=False the cached copy is ignored and replaced by the new download.
+    Keyword arguments (period or start/end, interval, ...) are passed to yf.download.
+    """
+    ticker_list = [tickers] if isinstance(tickers, str) else list(tickers)
+
+    cache_key = cache.make_key(ticker_list, **kwargs)
+    if use_cache:
+        df = cache.get(cache_key)
+        if df is not None:
+            return df
+
+    df = yf.download(tickers, threads=min(len(ticker_list), MAX_THREADS),
+                     progress=False, **kwargs)
+    if not df.empty:
+        cache.set(cache_key, df)
+
+    return df
+
+def _overlap_matches(history, recent, rtol=OVERLAP_RTOL):
+    """
+    Check that re-downloaded weekly bars agree with the stored ones on the weeks
+    both contain. Yahoo rescales all earlier adjusted prices after a dividend or
+    split, so a mismatch means the stored history is on an old price scale.
+    """
+    # The last stored week may have been downloaded before its week closed,
+    # so only the complete weeks before it are compared
+    overlap = recent.index.intersection(history.index)
+    overlap = overlap[overlap < history.index.max()]
+
+    # Compare prices only - volume is not adjusted
+    columns = recent.columns.intersection(history.columns)
+    columns = columns[columns.get_level_values(0) != 'Volume']
+    if overlap.empty or columns.empty:
+        return False
+
+    stored = history.loc[overlap, columns].to_numpy(dtype=np.float64)
+    fresh = recent.loc[overlap, columns].to_numpy(dtype=np.float64)
+    return np.allclose(fresh, stored, rtol=rtol, atol=0, equal_nan=True)
+
+def download_weekly_history(tickers, period, min_weeks, **kwargs):
+    """
+    Download weekly bars, keeping a persistent copy in the cache directory.
+
+    The first run downloads the full period. Later runs only download bars
+    from shortly before the last stored week and append them, as long as the
+    stored history still covers at least min_weeks bars and the re-downloaded
+    weeks still match the stored ones. Otherwise (e.g. after a dividend or split
+    rescaled the adjusted prices) the full range is downloaded again.
+    Extra keyword arguments (auto_adjust, actions, ...) are passed to yf.download.
+    """
+    ticker_list = [tickers] if isinstance(tickers, str) else list(tickers)
+    # v2: histories stored before the overlap check may contain a week that joins
+    # two price scales, so they are not reused
+    history_key = "|".join(
+        ["weekly-history-v2", ",".join(sorted(ticker_list))]
+        + [f"{name}={value}" for name, value in sorted(kwargs.items())]
+    )
+    history = cache.get(history_key, ttl=None)
+    use_cache = True
+
+    if history is not None and len(history) >= min_weeks:
+        # Re-fetch the last two stored weeks too, since the latest bar may have
+        # been downloaded before its week closed
+        last_date = history.index.max()
+        refresh_start = (last_date - timedelta(weeks=2)).strftime('%Y-%m-%d')
+        recent = download(tickers, start=refresh_start, interval="1wk", **kwargs)
+        if recent.empty:
+            return history
+
+        if _overlap_matches(history, recent):
+            history = pd.concat([history.loc[history.index < recent.index.min()], recent])
+            cache.set(history_key, history)
+            return history
+
+        # The stored prices no longer match Yahoo's (a dividend or split rescaled
+        # the adjusted prices), so fall through and download the full range again,
+        # bypassing a cached copy that may still be on the old scale
+        use_cache = False
+
+    history = download(tickers, period=period, interval="1wk", use_cache=use_cache, **kwargs)
+    if history.empty:
+        return history
+
+    cache.set(history_key, history)
+    return history